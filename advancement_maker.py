@@ -1,13 +1,17 @@
 import os
 import json
-import glob
+import orjson
 from pathlib import Path
 
+_CATEGORIES = ('building', 'misc', 'redstone', 'equipment')
+VALID_CATEGORIES = frozenset(_CATEGORIES)
+CATEGORY_PROMPT = f"Enter category {list(_CATEGORIES)} (press Enter to keep current): "
+
 def process_recipe_file(file_path):
     try:
         # Load the JSON file
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
         # Check if type field exists
         if 'type' not in data:
@@ -35,12 +39,11 @@ def process_recipe_file(file_path):
             print("No current group")
         
         # Ask for category if needed
-        valid_categories = ['building', 'misc', 'redstone', 'equipment']
-        category = input(f"Enter category {valid_categories} (press Enter to keep current): ")
+        category = input(CATEGORY_PROMPT)
         
-        if category and category in valid_categories:
+        if category and category in VALID_CATEGORIES:
             data['category'] = category
-        elif category and category not in valid_categories:
+        elif category and category not in VALID_CATEGORIES:
             print(f"Invalid category. Using {'current' if current_category else 'none'}")
         elif not category and current_category:
             category = current_category
@@ -57,6 +60,7 @@ def process_recipe_file(file_path):
             print("No group set")
         
         # Save the modified recipe file
+        # Written with json to keep the 4-space indentation used by the existing files
         with open(file_path, 'w') as f:
             json.dump(data, f, indent=4)
         print(f"Updated recipe file saved to {file_path}")
@@ -64,7 +68,7 @@ def process_recipe_file(file_path):
         # Now create the advancement file
         create_advancement_file(file_path, data)
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Invalid JSON format in {file_path}")
     except Exception as e:
         print(f"Error processing {file_path}: {str(e)}")
@@ -141,7 +145,7 @@ def main():
         return
     
     # Process all JSON files in the directory
-    json_files = glob.glob(os.path.join(recipe_dir, "*.json"))
+    json_files = [e.path for e in os.scandir(recipe_dir) if e.is_file() and e.name.endswith('.json')]
     
     if not json_files:
         print(f"No JSON files found in {recipe_dir}")
@@ -1,132 +1,357 @@
 import os
-import json
-import shutil
+import re
+import string
 import hashlib
-import tempfile
 import io
+import itertools
+import tempfile
+import time
 import zipfile
 import logging
-from flask import Flask, render_template, request, send_file, redirect, url_for, flash
+import logging.handlers
+import queue
+import threading
+import atexit
+import orjson
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, request, redirect, url_for, flash
+from flask_caching import Cache
+from flask_compress import Compress
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-# Set up logging
-logging.basicConfig(
-    filename='app.log',
-    level=logging.DEBUG,
-    format='%(asctime)s %(levelname)s: %(message)s'
-)
+# Set up logging. Records go through a queue to a background thread that writes app.log,
+# so file writes never block a request. LOG_LEVEL sets the level (default INFO).
+# The module can be imported more than once (e.g. as __main__ and as app), so the
+# handler and listener are only added the first time.
+_LOG_HANDLER_NAME = "better_recipes_log_queue"
+if not any(h.get_name() == _LOG_HANDLER_NAME for h in logging.getLogger().handlers):
+    _log_queue = queue.SimpleQueue()
+    _log_file_handler = logging.FileHandler('app.log')
+    _log_file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
+    _log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+    _log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+    _log_queue_handler.set_name(_LOG_HANDLER_NAME)
+    logging.getLogger().addHandler(_log_queue_handler)
+logging.getLogger().setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key"
 
-# Set up rate limiting
-limiter = Limiter(key_func=get_remote_address, default_limits=["10 per minute"])
+# Compress text responses only; datapack ZIPs are already deflated
+app.config["COMPRESS_MIMETYPES"] = [
+    "text/html",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+]
+Compress(app)
+
+# Set up rate limiting. The default in-memory storage is per process, so when running
+# several gunicorn workers set RATELIMIT_STORAGE_URI to shared storage (e.g.
+# "redis://localhost:6379", which needs the redis package) or each worker counts separately.
+limiter = Limiter(key_func=get_remote_address, default_limits=["10 per minute"],
+                  storage_uri=os.environ.get("RATELIMIT_STORAGE_URI", "memory://"))
 limiter.init_app(app)
 
 # Get base directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Cache finished datapack ZIPs on disk so repeated selections skip the build. The cache
+# unpickles whatever is in its directory, so it lives next to the app (or in
+# DATAPACK_CACHE_DIR) rather than under a predictable name in the shared temp dir.
+cache = Cache(config={
+    "CACHE_TYPE": "FileSystemCache",
+    "CACHE_DIR": os.environ.get("DATAPACK_CACHE_DIR", os.path.join(BASE_DIR, "cache")),
+    "CACHE_DEFAULT_TIMEOUT": 86400,
+})
+cache.init_app(app)
+
+# Number of threads used to read datapack source files, and how many reads may be in
+# flight at once; this bounds how many source files sit in memory while a ZIP streams
+READ_WORKERS = 8
+READ_AHEAD = READ_WORKERS * 2
+
+# Advancement files larger than this are not scanned for recipe references
+MAX_ADVANCEMENT_SIZE = 1024 * 1024
+
+# When DATAPACK_ACCEL_DIR is set, finished datapacks are written there and served by the
+# front-end web server via X-Accel-Redirect, e.g. for nginx:
+#     location /internal-dl/ { internal; alias /var/cache/datapacks/; }
+ACCEL_REDIRECT_DIR = os.environ.get("DATAPACK_ACCEL_DIR")
+ACCEL_REDIRECT_PREFIX = os.environ.get("DATAPACK_ACCEL_PREFIX", "/internal-dl/")
+# Datapacks in DATAPACK_ACCEL_DIR that haven't been served for this many seconds are deleted
+ACCEL_REDIRECT_MAX_AGE = 86400
+
+
+# Parsed options are cached until a file in the options folder changes. The lock keeps
+# concurrent requests from rebuilding the cache at the same time.
+_OPTIONS_CACHE = {"sig": None, "value": None}
+_OPTIONS_LOCK = threading.Lock()
+
 
 def load_options():
     """
     Loads all JSON files from the 'options' folder and groups them by category.
     A normalized_category field is added to standardize folder naming.
+    Returns (options_by_category, options_by_id, category_images). The result is
+    cached and only rebuilt when an options file is added, removed or modified.
     """
-    options_by_category = {}
     options_folder = os.path.join(BASE_DIR, "options")
 
-    if not os.path.exists(options_folder):
-        logging.warning(f"Options folder not found at: {options_folder}")
-        return options_by_category
-
-    for filename in os.listdir(options_folder):
-        if filename.endswith('.json'):
+    try:
+        with os.scandir(options_folder) as it:
+            entries = [e for e in it if e.name.endswith('.json') and e.is_file(follow_symlinks=False)]
+    except FileNotFoundError:
+        logger.warning("Options folder not found at: %s", options_folder)
+        return {}, {}, {}
+
+    sig = tuple(sorted((e.name, e.stat().st_mtime_ns) for e in entries))
+    if sig == _OPTIONS_CACHE["sig"]:
+        return _OPTIONS_CACHE["value"]
+
+    with _OPTIONS_LOCK:
+        # Another request may have rebuilt the cache while this one was waiting
+        if sig == _OPTIONS_CACHE["sig"]:
+            return _OPTIONS_CACHE["value"]
+
+        options_by_category = {}
+        for entry in entries:
             try:
-                with open(os.path.join(options_folder, filename), 'r', encoding='utf-8') as f:
-                    option = json.load(f)
-                option["id"] = filename
+                option = orjson.loads(_read_file(entry.path)[0])
+                option["id"] = entry.name
                 category = option.get("category", "Uncategorized")
                 # Normalize category for folder naming (adjust if needed)
-                option["normalized_category"] = category.lower().replace(" ", "_")
+                option["normalized_category"] = normalize_category(category)
                 if category not in options_by_category:
                     options_by_category[category] = []
                 options_by_category[category].append(option)
             except Exception as e:
-                logging.error(f"Error loading option file {filename}: {str(e)}")
+                logger.error("Error loading option file %s: %s", entry.name, e)
+
+        options_by_id = {opt["id"]: opt for opts in options_by_category.values() for opt in opts}
+        category_images = {category: get_category_image_path(category) for category in options_by_category}
+        value = (options_by_category, options_by_id, category_images)
+        # Store the value before the signature so a matching signature always has its value
+        _OPTIONS_CACHE["value"] = value
+        _OPTIONS_CACHE["sig"] = sig
+        return value
+
+
+# Lowercases ASCII letters and turns spaces into underscores in a single pass
+_CATEGORY_TABLE = str.maketrans(string.ascii_uppercase + " ", string.ascii_lowercase + "_")
 
-    return options_by_category
+
+def normalize_category(category):
+    """
+    Returns the folder/file name used for a category, e.g. "Convenience" -> "convenience".
+    """
+    return category.translate(_CATEGORY_TABLE)
 
 
 def get_category_image_path(category):
     """
     Returns the file path for the category's MC image.
     """
-    filename = category.lower().replace(" ", "_") + ".png"
+    filename = normalize_category(category) + ".png"
     return f"mc_images/{filename}"
 
 
-def advancement_references_selected(file_path, all_selected_recipes):
+def advancement_recipe_refs(file_path):
     """
-    Returns True if the advancement JSON (at file_path) references any of the selected recipes.
-    Expects criteria -> conditions -> recipe in the JSON.
+    Returns the recipe IDs (without namespace) that the advancement JSON at file_path
+    references through criteria -> conditions -> recipe.
     """
+    recipe_ids = set()
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        if "criteria" in data:
-            for criterion in data["criteria"].values():
-                if (
-                    isinstance(criterion, dict) and 
-                    "conditions" in criterion and 
-                    "recipe" in criterion["conditions"]
-                ):
-                    recipe_ref = criterion["conditions"]["recipe"]
-                    if isinstance(recipe_ref, str):
-                        # Extract just the recipe ID part without namespace
-                        if ":" in recipe_ref:
-                            recipe_id = recipe_ref.split(":", 1)[1]
-                            logging.debug(f"Checking if recipe '{recipe_id}' is in selected recipes")
-                            if recipe_id in all_selected_recipes:
-                                return True
-                        else:
-                            # Handle case where there might not be a namespace
-                            if recipe_ref in all_selected_recipes:
-                                return True
-                                
-        # Add debug logging to see what's happening when no match is found
-        logging.debug(f"No matching recipes found in {file_path}. Selected recipes: {all_selected_recipes}")
-        return False
+        content, st = _read_file(file_path, MAX_ADVANCEMENT_SIZE)
+        if content is None:
+            logger.warning("Skipping advancement file %s: %d bytes is over the size limit", file_path, st.st_size)
+            return recipe_ids
+        data = orjson.loads(content)
+        for criterion in data.get("criteria", {}).values():
+            if (
+                isinstance(criterion, dict) and
+                "conditions" in criterion and
+                "recipe" in criterion["conditions"]
+            ):
+                recipe_ref = criterion["conditions"]["recipe"]
+                if isinstance(recipe_ref, str):
+                    # Keep just the recipe ID part without namespace
+                    recipe_ids.add(recipe_ref.split(":", 1)[-1])
     except Exception as e:
-        logging.warning(f"Error reading advancement file {file_path}: {str(e)}")
-        return False
+        logger.warning("Error reading advancement file %s: %s", file_path, e)
+    return recipe_ids
+
+
+# Index of recipe and info advancement files, rebuilt when an indexed directory or a
+# recipe advancement file changes
+_SOURCE_INDEX_CACHE = {"paths": None, "sig": None, "index": None}
+_SOURCE_INDEX_LOCK = threading.Lock()
+
+
+def _scan_json_files(folder, scanned_dirs, recursive=True, prefix=""):
+    """
+    Maps each JSON file in folder to its path, keyed by its relative name without
+    the extension (e.g. "hopper"). Records the mtime of every scanned directory.
+    """
+    files = {}
+    if not os.path.isdir(folder):
+        return files
+    scanned_dirs[folder] = os.stat(folder).st_mtime_ns
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if recursive:
+                    files.update(_scan_json_files(entry.path, scanned_dirs, recursive, f"{prefix}{entry.name}/"))
+            elif entry.name.endswith('.json'):
+                files[prefix + entry.name[:-5]] = entry.path
+    return files
+
+
+def load_source_index():
+    """
+    Returns an index of the source files in the Better Recipes data folder:
+    {"recipes": {namespace: {recipe: path}}, "info": {category: {option_id: path}},
+     "recipe_advancements": {recipe: [path, ...]}}.
+    recipe_advancements maps each recipe ID to the recipe advancements that reference it.
+    The index is cached and only rebuilt when one of the indexed directories changes, or
+    when a recipe advancement file is edited, since recipe_advancements depends on their contents.
+    """
+    # Checked and rebuilt under the lock so the three cache fields are always consistent
+    with _SOURCE_INDEX_LOCK:
+        if _SOURCE_INDEX_CACHE["paths"] is not None:
+            try:
+                sig = tuple(os.stat(p).st_mtime_ns for p in _SOURCE_INDEX_CACHE["paths"])
+            except OSError:
+                sig = None
+            if sig == _SOURCE_INDEX_CACHE["sig"]:
+                return _SOURCE_INDEX_CACHE["index"]
+
+        data_path = os.path.join(BASE_DIR, "Better Recipes", "data")
+        # mtimes of the scanned directories and recipe advancement files
+        scanned_paths = {}
+        recipes = {}
+        for namespace in ['betterr', 'minecraft']:
+            recipes[namespace] = _scan_json_files(os.path.join(data_path, namespace, "recipe"), scanned_paths)
+
+        info = {}
+        info_path = os.path.join(data_path, "betterr", "advancement", "info")
+        if os.path.isdir(info_path):
+            scanned_paths[info_path] = os.stat(info_path).st_mtime_ns
+            with os.scandir(info_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        info[entry.name] = _scan_json_files(entry.path, scanned_paths, recursive=False)
+
+        # Reverse index from recipe ID to the advancements that unlock it
+        recipe_advancements = {}
+        recipes_adv_path = os.path.join(data_path, "betterr", "advancement", "recipes")
+        for adv_path in _scan_json_files(recipes_adv_path, scanned_paths, recursive=False).values():
+            # Stat before reading so an edit made during the read still triggers a rebuild
+            scanned_paths[adv_path] = os.stat(adv_path).st_mtime_ns
+            for recipe_id in advancement_recipe_refs(adv_path):
+                recipe_advancements.setdefault(recipe_id, []).append(adv_path)
+
+        index = {"recipes": recipes, "info": info, "recipe_advancements": recipe_advancements}
+        _SOURCE_INDEX_CACHE.update(paths=tuple(scanned_paths), sig=tuple(scanned_paths.values()), index=index)
+        return index
+
+
+def _iter_files(root, suffix):
+    """
+    Recursively yields (path, relative_path) for every file under root whose name ends
+    with suffix. relative_path uses "/" separators so it can be used as a ZIP path.
+    """
+    stack = [(root, "")]
+    while stack:
+        folder, rel = stack.pop()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                sub = f"{rel}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, sub + "/"))
+                elif entry.name.endswith(suffix):
+                    yield entry.path, sub
+
+
+def _read_file(path, max_size=None):
+    """
+    Reads a whole file with a single open/fstat/read sequence, skipping the buffered
+    file object. Returns the contents and the fstat result. If the file is larger
+    than max_size, nothing is read and the contents are None.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        st = os.fstat(fd)
+        if max_size is not None and st.st_size > max_size:
+            return None, st
+        data = os.read(fd, st.st_size)
+        while len(data) < st.st_size:
+            chunk = os.read(fd, st.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data, st
+    finally:
+        os.close(fd)
+
+
+def _read_source_file(src, arcname):
+    """
+    Reads a datapack source file, returning its ZipInfo (which keeps the file's
+    timestamp and mode) and its contents.
+    """
+    data, st = _read_file(src)
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    return zinfo, data
 
 
-def create_datapack(output_path, selected_options):
+def collect_datapack_files(selected_options):
     """
-    Creates the datapack with selected recipes and filtered advancements.
+    Works out the contents of the datapack with selected recipes and filtered advancements,
+    without reading any source files. Returns a dict with "generated" [(arcname, data), ...]
+    for files created here, "sources" [(src, arcname), ...] for files copied from disk and
+    "stats" with the copy counts.
     """
     better_recipes_path = os.path.join(BASE_DIR, "Better Recipes")
     output_template_path = os.path.join(BASE_DIR, "output", "template")
 
-    # Ensure the output directory exists
-    os.makedirs(output_path, exist_ok=True)
-
     # Verify the template directory exists
     if not os.path.exists(better_recipes_path):
-        logging.error(f"Better Recipes directory not found at: {better_recipes_path}")
+        logger.error("Better Recipes directory not found at: %s", better_recipes_path)
         raise FileNotFoundError(f"Better Recipes directory not found at: {better_recipes_path}")
 
     # Verify the output template directory exists
     if not os.path.exists(output_template_path):
-        logging.warning(f"Output template directory not found at: {output_template_path}")
+        logger.warning("Output template directory not found at: %s", output_template_path)
         # Continue execution, we'll handle missing files individually
 
+    # Source files are queued under their datapack-relative path and read later by
+    # write_datapack; the same path is only queued once
+    generated_files = []
+    pending_files = []
+    written_files = set()
+
+    def add_file(src, arcname):
+        if arcname in written_files:
+            return False
+        pending_files.append((src, arcname))
+        written_files.add(arcname)
+        return True
+
     # Copy pack.mcmeta (or create default)
     pack_mcmeta_src = os.path.join(better_recipes_path, "pack.mcmeta")
     if os.path.exists(pack_mcmeta_src):
-        shutil.copy2(pack_mcmeta_src, os.path.join(output_path, "pack.mcmeta"))
-        logging.info(f"Copied pack.mcmeta from {pack_mcmeta_src}")
+        add_file(pack_mcmeta_src, "pack.mcmeta")
+        logger.info("Copied pack.mcmeta from %s", pack_mcmeta_src)
     else:
         default_mcmeta = {
             "pack": {
@@ -134,182 +359,158 @@ def create_datapack(output_path, selected_options):
                 "description": "https://luigitime34.pythonanywhere.com/"
             }
         }
-        with open(os.path.join(output_path, "pack.mcmeta"), 'w', encoding='utf-8') as f:
-            json.dump(default_mcmeta, f, indent=4)
-        logging.info("Created default pack.mcmeta")
-
-    # Create necessary directories for each namespace
-    for namespace in ['betterr', 'minecraft']:
-        os.makedirs(os.path.join(output_path, "data", namespace, "recipe"), exist_ok=True)
-        os.makedirs(os.path.join(output_path, "data", namespace, "advancement"), exist_ok=True)
-        os.makedirs(os.path.join(output_path, "data", namespace, "advancement", "info"), exist_ok=True)
-        os.makedirs(os.path.join(output_path, "data", namespace, "function"), exist_ok=True)
-        os.makedirs(os.path.join(output_path, "data", namespace, "tags", "function"), exist_ok=True)
+        generated_files.append(("pack.mcmeta", orjson.dumps(default_mcmeta, option=orjson.OPT_INDENT_2)))
+        written_files.add("pack.mcmeta")
+        logger.info("Created default pack.mcmeta")
 
     # Write selected recipes to a file
     selected_names = [opt['display_name'] for opt in selected_options]
-    with open(os.path.join(output_path, 'SELECTED_RECIPES.txt'), 'w', encoding='utf-8') as f:
-        f.write('\n'.join(selected_names))
+    generated_files.append(('SELECTED_RECIPES.txt', '\n'.join(selected_names).encode()))
+    written_files.add('SELECTED_RECIPES.txt')
 
-    logging.info(f"Selected options: {selected_options}")
+    logger.debug("Selected options: %s", selected_options)
+
+    source_index = load_source_index()
 
     recipes_copied = 0
     advancements_copied = 0
     function_files_copied = 0
 
-    # Gather all selected categories
-    selected_categories = set()
-    for option in selected_options:
-        if 'normalized_category' in option:
-            selected_categories.add(option['normalized_category'])
-        elif 'category' in option:
-            # Normalize category if normalized_category is not present
-            category = option['category'].lower().replace(" ", "_")
-            selected_categories.add(category)
+    # Gather all selected categories, normalizing the category if normalized_category is not present
+    selected_categories = {
+        option['normalized_category'] if 'normalized_category' in option else normalize_category(option['category'])
+        for option in selected_options
+        if 'normalized_category' in option or 'category' in option
+    }
     
-    logging.info(f"Selected categories: {selected_categories}")
+    logger.info("Selected categories: %s", selected_categories)
 
-    # Collect all selected recipe IDs
-    all_selected_recipes = set()
+    # Group selected option IDs (filenames without extension) by category in one pass
+    selected_by_category = defaultdict(list)
     for option in selected_options:
-        for recipe in option.get('recipes', []):
-            all_selected_recipes.add(recipe)
-            # Also add without namespace
-            if ":" in recipe:
-                all_selected_recipes.add(recipe.split(":", 1)[1])
+        option_id = option.get('id', '').removesuffix('.json')
+        if option_id:
+            selected_by_category[option.get('normalized_category', '').lower()].append(option_id)
+
+    # Collect all selected recipe IDs, both as given and without namespace
+    all_selected_recipes = {
+        recipe_id
+        for option in selected_options
+        for recipe in option.get('recipes', [])
+        for recipe_id in (recipe, recipe.split(":", 1)[-1])
+    }
     
-    logging.info(f"All selected recipes: {all_selected_recipes}")
+    logger.info("All selected recipes: %s", all_selected_recipes)
 
     # Copy selected recipes from both namespaces
     for option in selected_options:
         for recipe in option.get('recipes', []):
-            logging.info(f"Processing recipe: {recipe}")
+            logger.debug("Processing recipe: %s", recipe)
             for namespace in ['betterr', 'minecraft']:
-                recipe_src = os.path.join(better_recipes_path, "data", namespace, "recipe", f"{recipe}.json")
-                recipe_dest = os.path.join(output_path, "data", namespace, "recipe", f"{recipe}.json")
-                if os.path.exists(recipe_src):
-                    os.makedirs(os.path.dirname(recipe_dest), exist_ok=True)
-                    shutil.copy2(recipe_src, recipe_dest)
-                    recipes_copied += 1
-                    logging.info(f"Copied recipe: {recipe_src} to {recipe_dest}")
+                recipe_src = source_index["recipes"][namespace].get(recipe)
+                recipe_dest = f"data/{namespace}/recipe/{recipe}.json"
+                if recipe_src:
+                    if add_file(recipe_src, recipe_dest):
+                        recipes_copied += 1
+                    logger.debug("Copied recipe: %s to %s", recipe_src, recipe_dest)
                 else:
-                    logging.warning(f"Recipe not found: {recipe_src}")
+                    logger.warning("Recipe not found: %s:%s", namespace, recipe)
 
     # Copy advancements from output/template directory
     namespace = 'betterr'  # Only process betterr namespace
     
     # New path structure - looking in output/template directory
     adv_src_base = os.path.join(output_template_path, "data", namespace, "advancement")
-    adv_dest_base = os.path.join(output_path, "data", namespace, "advancement")
+    adv_dest_base = f"data/{namespace}/advancement"
 
     # Check if the source directory exists
     if not os.path.exists(adv_src_base):
-        logging.error(f"Advancement directory not found at: {adv_src_base}")
+        logger.error("Advancement directory not found at: %s", adv_src_base)
     else:
-        logging.info(f"Processing advancements from path: {adv_src_base}")
-        
-        # Create the advancement directory if it doesn't exist
-        os.makedirs(adv_dest_base, exist_ok=True)
-        
+        logger.info("Processing advancements from path: %s", adv_src_base)
         
         # Clone advancements from info folder
         info_path = os.path.join(adv_src_base, "info")
         if os.path.exists(info_path) and os.path.isdir(info_path):
-            dest_info_path = os.path.join(adv_dest_base, "info")
-            os.makedirs(dest_info_path, exist_ok=True)
-            logging.info(f"Copying info advancements from {info_path}")
+            dest_info_path = f"{adv_dest_base}/info"
+            logger.info("Copying info advancements from %s", info_path)
             
             # First, copy root.json if it exists
             root_json_path = os.path.join(info_path, "root.json")
             if os.path.exists(root_json_path):
-                shutil.copy2(root_json_path, os.path.join(dest_info_path, "root.json"))
-                advancements_copied += 1
-                logging.info("Copied root.json")
+                if add_file(root_json_path, f"{dest_info_path}/root.json"):
+                    advancements_copied += 1
+                logger.debug("Copied root.json")
             
-            # Copy JSON files that relate to each selected category
-            for filename in os.listdir(info_path):
-                file_path = os.path.join(info_path, filename)
+            # Copy JSON files that relate to each selected category, using one pattern that
+            # matches any selected category name
+            category_pattern = None
+            if selected_categories:
+                category_pattern = re.compile('|'.join(re.escape(category) for category in selected_categories))
+            with os.scandir(info_path) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    file_path = entry.path
                 
-                # Skip directories and non-JSON files at root level
-                if os.path.isdir(file_path) or not filename.endswith('.json'):
-                    continue
+                    # Skip directories and non-JSON files at root level
+                    if entry.is_dir() or not filename.endswith('.json'):
+                        continue
                     
-                # Skip root.json (already handled)
-                if filename == "root.json":
-                    continue
+                    # Skip root.json (already handled)
+                    if filename == "root.json":
+                        continue
                 
-                # Check if this JSON file relates to a selected category
-                category_match = False
-                for category in selected_categories:
-                    if category in filename.lower():
-                        category_match = True
-                        break
-                        
-                if category_match:
-                    dest_file = os.path.join(dest_info_path, filename)
-                    shutil.copy2(file_path, dest_file)
-                    advancements_copied += 1
-                    logging.info(f"Copied category JSON: {filename}")
+                    # Check if this JSON file relates to a selected category
+                    if category_pattern and category_pattern.search(filename.lower()):
+                        if add_file(file_path, f"{dest_info_path}/{filename}"):
+                            advancements_copied += 1
+                        logger.debug("Copied category JSON: %s", filename)
             
             # Use the original Better Recipes path for category folders
             original_info_path = os.path.join(better_recipes_path, "data", namespace, "advancement", "info")
-            logging.info(f"Looking for category folders in: {original_info_path}")
+            logger.info("Looking for category folders in: %s", original_info_path)
             
             if os.path.exists(original_info_path) and os.path.isdir(original_info_path):
                 # Process each selected category
                 for category in selected_categories:
                     src_category_path = os.path.join(original_info_path, category)
+                    src_category_files = source_index["info"].get(category)
                     
-                    if os.path.exists(src_category_path) and os.path.isdir(src_category_path):
-                        logging.info(f"Found category folder: {category}")
+                    if src_category_files is not None:
+                        logger.debug("Found category folder: %s", category)
                         
-                        # Create the category folder in destination
-                        dest_category_path = os.path.join(dest_info_path, category)
-                        os.makedirs(dest_category_path, exist_ok=True)
+                        # Destination category folder
+                        dest_category_path = f"{dest_info_path}/{category}"
                         
                         # Get options for this category
-                        category_options = []
-                        for option in selected_options:
-                            option_category = option.get('normalized_category', '').lower()
-                            if option_category == category.lower():
-                                # Get the option ID (filename without extension)
-                                option_id = option.get('id', '').split('.')[0]
-                                if option_id:
-                                    category_options.append(option_id)
+                        category_options = selected_by_category.get(category.lower(), [])
                         
-                        logging.info(f"Selected options for {category}: {category_options}")
+                        logger.debug("Selected options for %s: %s", category, category_options)
                         
-                        # Check each file in the category folder
+                        # Look up each selected option in the category folder
                         option_files_found = False
-                        for option_file in os.listdir(src_category_path):
-                            if not option_file.endswith('.json'):
-                                continue
-                                
-                            option_id = option_file.split('.')[0]
-                            
-                            # Check if this option was selected
-                            if option_id in category_options:
-                                src_option_path = os.path.join(src_category_path, option_file)
-                                dest_option_path = os.path.join(dest_category_path, option_file)
-                                shutil.copy2(src_option_path, dest_option_path)
-                                advancements_copied += 1
+                        for option_id in category_options:
+                            src_option_path = src_category_files.get(option_id)
+                            if src_option_path:
+                                option_file = f"{option_id}.json"
+                                if add_file(src_option_path, f"{dest_category_path}/{option_file}"):
+                                    advancements_copied += 1
                                 option_files_found = True
-                                logging.info(f"Copied option file: {category}/{option_file}")
+                                logger.debug("Copied option file: %s/%s", category, option_file)
                         
                         if not option_files_found:
-                            logging.warning(f"No matching option files found for category: {category}")
+                            logger.warning("No matching option files found for category: %s", category)
                     else:
-                        logging.warning(f"Category folder not found: {src_category_path}")
+                        logger.warning("Category folder not found: %s", src_category_path)
             else:
-                logging.warning(f"Original info directory not found: {original_info_path}")
+                logger.warning("Original info directory not found: %s", original_info_path)
 
         # Copy recipe advancements from betterr namespace only
         recipes_adv_src = os.path.join(better_recipes_path, "data", "betterr", "advancement", "recipes")
-        recipes_adv_dest = os.path.join(output_path, "data", "betterr", "advancement", "recipes")
+        recipes_adv_dest = "data/betterr/advancement/recipes"
 
-        if os.path.exists(recipes_adv_src) and os.path.isdir(recipes_adv_src):
-            os.makedirs(recipes_adv_dest, exist_ok=True)
-            logging.info(f"Copying recipe advancements from {recipes_adv_src}")
+        if source_index["recipe_advancements"]:
+            logger.info("Copying recipe advancements from %s", recipes_adv_src)
             
             # For each selected recipe, find and copy its advancement file if it exists
             recipe_advancements_copied = 0
@@ -321,181 +522,322 @@ def create_datapack(output_path, selected_options):
                         continue
                     recipe_id = name  # Use only the name part without namespace
                 
-                # Look for the recipe advancement file
-                recipe_adv_file = f"{recipe_id}.json"
-                recipe_adv_path = os.path.join(recipes_adv_src, recipe_adv_file)
+                # Look up the advancements that reference this recipe
+                recipe_adv_paths = source_index["recipe_advancements"].get(recipe_id)
                 
-                if os.path.exists(recipe_adv_path):
-                    dest_file = os.path.join(recipes_adv_dest, recipe_adv_file)
-                    shutil.copy2(recipe_adv_path, dest_file)
-                    recipe_advancements_copied += 1
-                    logging.info(f"Copied recipe advancement: {recipe_adv_file}")
+                if recipe_adv_paths:
+                    for recipe_adv_path in recipe_adv_paths:
+                        recipe_adv_file = os.path.basename(recipe_adv_path)
+                        if add_file(recipe_adv_path, f"{recipes_adv_dest}/{recipe_adv_file}"):
+                            recipe_advancements_copied += 1
+                        logger.debug("Copied recipe advancement: %s", recipe_adv_file)
                 else:
-                    logging.debug(f"No advancement file found for recipe: {recipe_id}")
+                    logger.debug("No advancement file found for recipe: %s", recipe_id)
             
-            logging.info(f"Copied {recipe_advancements_copied} recipe advancement files")
+            logger.info("Copied %s recipe advancement files", recipe_advancements_copied)
             advancements_copied += recipe_advancements_copied
         
         # Copy triggers advancements
         triggers_path = os.path.join(adv_src_base, "triggers")
         if os.path.exists(triggers_path) and os.path.isdir(triggers_path):
-            dest_triggers_path = os.path.join(adv_dest_base, "triggers")
-            os.makedirs(dest_triggers_path, exist_ok=True)
-            logging.info(f"Copying triggers advancements from {triggers_path}")
+            dest_triggers_path = f"{adv_dest_base}/triggers"
+            logger.info("Copying triggers advancements from %s", triggers_path)
             
-            for root, _, files in os.walk(triggers_path):
-                for file in files:
-                    if file.endswith('.json'):
-                        src_file = os.path.join(root, file)
-                        rel_path = os.path.relpath(src_file, triggers_path)
-                        dest_file = os.path.join(dest_triggers_path, rel_path)
-                        
-                        # Ensure the destination directory exists
-                        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
-                        
-                        # Copy the file
-                        shutil.copy2(src_file, dest_file)
-                        advancements_copied += 1
-                        logging.info(f"Copied triggers advancement: {rel_path}")
+            for src_file, rel_path in _iter_files(triggers_path, '.json'):
+                if add_file(src_file, f"{dest_triggers_path}/{rel_path}"):
+                    advancements_copied += 1
+                logger.debug("Copied triggers advancement: %s", rel_path)
 
         # Also check for other directories that might need to be copied
-        for item in os.listdir(adv_src_base):
-            item_path = os.path.join(adv_src_base, item)
-            if os.path.isdir(item_path) and item not in ('info', 'triggers'):
-                dest_item_path = os.path.join(adv_dest_base, item)
-                os.makedirs(dest_item_path, exist_ok=True)
-                logging.info(f"Copying advancements from {item_path}")
+        with os.scandir(adv_src_base) as entries:
+            for entry in entries:
+                item = entry.name
+                item_path = entry.path
+                if entry.is_dir() and item not in ('info', 'triggers'):
+                    dest_item_path = f"{adv_dest_base}/{item}"
+                    logger.info("Copying advancements from %s", item_path)
                 
-                for root, _, files in os.walk(item_path):
-                    for file in files:
-                        if file.endswith('.json'):
-                            src_file = os.path.join(root, file)
-                            rel_path = os.path.relpath(src_file, item_path)
-                            dest_file = os.path.join(dest_item_path, rel_path)
-                            
-                            # Ensure the destination directory exists
-                            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
-                            
-                            # Copy the file
-                            shutil.copy2(src_file, dest_file)
+                    for src_file, rel_path in _iter_files(item_path, '.json'):
+                        if add_file(src_file, f"{dest_item_path}/{rel_path}"):
                             advancements_copied += 1
-                            logging.info(f"Copied {item} advancement: {rel_path}")
+                        logger.debug("Copied %s advancement: %s", item, rel_path)
 
     # Copy function files from output/template directory too
     functions_src = os.path.join(output_template_path, "data", "betterr", "function")
-    functions_dest = os.path.join(output_path, "data", "betterr", "function")
+    functions_dest = "data/betterr/function"
     
     if os.path.exists(functions_src) and os.path.isdir(functions_src):
-        os.makedirs(functions_dest, exist_ok=True)
-        logging.info(f"Copying function files from {functions_src}")
+        logger.info("Copying function files from %s", functions_src)
         
-        for root, _, files in os.walk(functions_src):
-            for file in files:
-                if file.endswith('.mcfunction'):
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, functions_src)
-                    dest_file = os.path.join(functions_dest, rel_path)
-                    os.makedirs(os.path.dirname(dest_file), exist_ok=True)
-                    shutil.copy2(file_path, dest_file)
-                    function_files_copied += 1
-                    logging.info(f"Copied function file: {rel_path}")
+        for file_path, rel_path in _iter_files(functions_src, '.mcfunction'):
+            if add_file(file_path, f"{functions_dest}/{rel_path}"):
+                function_files_copied += 1
+            logger.debug("Copied function file: %s", rel_path)
     
     # Also try the original Better Recipes path for functions
     alt_functions_src = os.path.join(better_recipes_path, "data", "betterr", "function")
     if os.path.exists(alt_functions_src) and os.path.isdir(alt_functions_src):
-        os.makedirs(functions_dest, exist_ok=True)
-        logging.info(f"Copying function files from alternate path {alt_functions_src}")
+        logger.info("Copying function files from alternate path %s", alt_functions_src)
         
-        for root, _, files in os.walk(alt_functions_src):
-            for file in files:
-                if file.endswith('.mcfunction'):
-                    file_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(file_path, alt_functions_src)
-                    dest_file = os.path.join(functions_dest, rel_path)
-                    os.makedirs(os.path.dirname(dest_file), exist_ok=True)
-                    shutil.copy2(file_path, dest_file)
-                    function_files_copied += 1
-                    logging.info(f"Copied function file from alternate path: {rel_path}")
+        for file_path, rel_path in _iter_files(alt_functions_src, '.mcfunction'):
+            # Files already taken from output/template are skipped
+            if add_file(file_path, f"{functions_dest}/{rel_path}"):
+                function_files_copied += 1
+                logger.debug("Copied function file from alternate path: %s", rel_path)
 
     # Copy function tags for both namespaces
     for namespace in ['betterr', 'minecraft']:
         # Try output/template path first
         tags_src = os.path.join(output_template_path, "data", namespace, "tags", "function")
-        tags_dest = os.path.join(output_path, "data", namespace, "tags", "function")
+        tags_dest = f"data/{namespace}/tags/function"
         
         if os.path.exists(tags_src) and os.path.isdir(tags_src):
-            os.makedirs(tags_dest, exist_ok=True)
-            logging.info(f"Copying function tags from {tags_src}")
+            logger.info("Copying function tags from %s", tags_src)
             
             for file in os.listdir(tags_src):
                 if file.endswith('.json'):
                     file_path = os.path.join(tags_src, file)
-                    dest_file = os.path.join(tags_dest, file)
-                    shutil.copy2(file_path, dest_file)
-                    function_files_copied += 1
-                    logging.info(f"Copied function tag: {file}")
+                    if add_file(file_path, f"{tags_dest}/{file}"):
+                        function_files_copied += 1
+                    logger.debug("Copied function tag: %s", file)
         
         # Also try the original Better Recipes path
         alt_tags_src = os.path.join(better_recipes_path, "data", namespace, "tags", "function")
         if os.path.exists(alt_tags_src) and os.path.isdir(alt_tags_src):
-            os.makedirs(tags_dest, exist_ok=True)
-            logging.info(f"Copying function tags from alternate path {alt_tags_src}")
+            logger.info("Copying function tags from alternate path %s", alt_tags_src)
             
             for file in os.listdir(alt_tags_src):
                 if file.endswith('.json'):
                     file_path = os.path.join(alt_tags_src, file)
-                    dest_file = os.path.join(tags_dest, file)
-                    shutil.copy2(file_path, dest_file)
-                    function_files_copied += 1
-                    logging.info(f"Copied function tag from alternate path: {file}")
-
-    logging.info(f"Datapack creation completed. Copied {recipes_copied} recipes, {advancements_copied} advancements, and {function_files_copied} function files.")
+                    # Tags already taken from output/template are skipped
+                    if add_file(file_path, f"{tags_dest}/{file}"):
+                        function_files_copied += 1
+                        logger.debug("Copied function tag from alternate path: %s", file)
 
     return {
-        "recipes_copied": recipes_copied,
-        "advancements_copied": advancements_copied,
-        "function_files_copied": function_files_copied,
-        "selected_options": len(selected_options)
+        "generated": generated_files,
+        "sources": pending_files,
+        "stats": {
+            "recipes_copied": recipes_copied,
+            "advancements_copied": advancements_copied,
+            "function_files_copied": function_files_copied,
+            "selected_options": len(selected_options)
+        }
     }
 
-def create_zip_in_memory(directory_path):
+
+def _read_source_files(sources):
+    """
+    Yields (zinfo, data) for each (src, arcname) in sources, in order. Files are read on a
+    thread pool, but only READ_AHEAD reads are queued ahead of the caller.
+    """
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        in_flight = deque()
+        for src, arcname in sources:
+            in_flight.append(executor.submit(_read_source_file, src, arcname))
+            if len(in_flight) >= READ_AHEAD:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def write_datapack(zf, datapack_files):
+    """
+    Writes the files from collect_datapack_files() into the open ZipFile zf.
+    This is a generator: it yields after each source file is added so callers can send the
+    archive while it is being built, and returns the copy statistics when exhausted.
+    """
+    for arcname, data in datapack_files["generated"]:
+        zf.writestr(arcname, data)
+
+    # Read the queued files concurrently and add them to the ZIP in order
+    for zinfo, data in _read_source_files(datapack_files["sources"]):
+        zf.writestr(zinfo, data, compress_type=zf.compression, compresslevel=zf.compresslevel)
+        yield
+
+    stats = datapack_files["stats"]
+    logger.info("Datapack creation completed. Copied %s recipes, %s advancements, and %s function files.",
+                stats["recipes_copied"], stats["advancements_copied"], stats["function_files_copied"])
+    return stats
+
+
+def create_datapack(zf, datapack_files):
+    """
+    Writes the whole datapack from collect_datapack_files() into the open ZipFile zf and
+    returns the copy statistics.
+    """
+    writer = write_datapack(zf, datapack_files)
+    while True:
+        try:
+            next(writer)
+        except StopIteration as done:
+            return done.value
+
+
+class _ZipStream:
+    """
+    Write-only, non-seekable file object for ZipFile that buffers the archive bytes
+    until they are drained. ZipFile falls back to data descriptors since it cannot seek.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+# Streamed datapacks are sent in chunks of at least this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_datapack(datapack_files):
+    """
+    Builds the datapack ZIP and yields it in chunks as files are added, so the download
+    starts before the archive is complete. Only about one chunk of output and READ_AHEAD
+    source files are held in memory at a time.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for _ in write_datapack(zf, datapack_files):
+            if stream.size >= STREAM_CHUNK_SIZE:
+                yield stream.drain()
+    yield stream.drain()
+
+
+# Datapacks larger than this are streamed without being kept for the cache
+MAX_CACHED_DATAPACK_SIZE = 8 * 1024 * 1024
+
+
+def cache_datapack(cache_key, chunks):
+    """
+    Passes the datapack chunks through and stores the complete ZIP in the cache once the
+    last chunk has been produced. Aborted downloads and ZIPs over MAX_CACHED_DATAPACK_SIZE
+    are not cached, so a large datapack is never held in memory as a whole.
+    """
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > MAX_CACHED_DATAPACK_SIZE:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        cache.set(cache_key, b"".join(parts))
+
+
+def datapack_cache_key(datapack_files):
+    """
+    Returns the cache key for a datapack from collect_datapack_files(). It covers the
+    generated files and the path, mtime and size of every source file in the pack, so
+    adding, removing or editing any file that ends up in the ZIP invalidates it.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for arcname, data in datapack_files["generated"]:
+        h.update(repr((arcname, len(data))).encode())
+        h.update(data)
+    for src, arcname in datapack_files["sources"]:
+        st = os.stat(src)
+        h.update(repr((arcname, src, st.st_mtime_ns, st.st_size)).encode())
+    return f"datapack_{h.hexdigest()}"
+
+
+def prune_accel_dir():
     """
-    Creates a ZIP file in memory from a directory.
+    Deletes datapacks (and leftover temporary files) in ACCEL_REDIRECT_DIR that haven't
+    been served within ACCEL_REDIRECT_MAX_AGE seconds.
     """
-    memory_file = io.BytesIO()
-    with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, directory_path)
-                logging.info(f"Adding to ZIP: {file_path} as {arcname}")
-                zf.write(file_path, arcname)
-    memory_file.seek(0)
-    return memory_file
+    cutoff = time.time() - ACCEL_REDIRECT_MAX_AGE
+    with os.scandir(ACCEL_REDIRECT_DIR) as it:
+        for entry in it:
+            if (entry.name.startswith("datapack_") and entry.is_file(follow_symlinks=False) and
+                    entry.stat().st_mtime < cutoff):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def send_datapack_via_accel(datapack_files, cache_key, zip_filename):
+    """
+    Writes the datapack ZIP into ACCEL_REDIRECT_DIR and returns an X-Accel-Redirect
+    response, so the front-end web server sends the file instead of the Python process.
+    The file is named after the cache key, so an unchanged datapack is reused instead of rebuilt.
+    """
+    os.makedirs(ACCEL_REDIRECT_DIR, exist_ok=True)
+    stored_name = f"{cache_key}.zip"
+    stored_path = os.path.join(ACCEL_REDIRECT_DIR, stored_name)
+    try:
+        # Mark the datapack as recently served so pruning keeps it
+        os.utime(stored_path)
+    except FileNotFoundError:
+        prune_accel_dir()
+        fd, tmp_path = tempfile.mkstemp(dir=ACCEL_REDIRECT_DIR, prefix='datapack_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                with zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+                    create_datapack(zf, datapack_files)
+            # mkstemp creates the file as owner-only; the web server needs to read it
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, stored_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    response = Response(mimetype='application/zip')
+    response.headers['X-Accel-Redirect'] = ACCEL_REDIRECT_PREFIX + stored_name
+    response.headers['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
+    return response
+
+
+def is_import_request():
+    """
+    Returns True if the current POST is the import form, which only reads the uploaded
+    ZIP's SELECTED_RECIPES.txt and is much cheaper than building a datapack.
+    """
+    return 'import_zip' in request.files and bool(request.files['import_zip'].filename)
 
 
 @app.route("/", methods=["GET", "POST"])
-@limiter.limit("10 per minute")
+@limiter.limit("10 per minute", methods=["GET", "HEAD"])
+# Building the datapack ZIP gets a tighter limit than importing one
+@limiter.limit("3 per minute", methods=["POST"], exempt_when=is_import_request)
+@limiter.limit("10 per minute", methods=["POST"], exempt_when=lambda: not is_import_request())
 def index():
     try:
         imported_recipes = []
-        options_by_category = load_options()
-        category_images = {category: get_category_image_path(category) for category in options_by_category}
+        options_by_category, options_by_id, category_images = load_options()
 
         if request.method == "POST":
             # Handle ZIP import
-            if 'import_zip' in request.files and request.files['import_zip'].filename:
+            if is_import_request():
                 import_file = request.files['import_zip']
                 try:
                     with zipfile.ZipFile(import_file, 'r') as z:
-                        if "SELECTED_RECIPES.txt" in z.namelist():
-                            with z.open("SELECTED_RECIPES.txt") as f:
-                                content = f.read().decode("utf-8")
-                                imported_recipes = [line.strip() for line in content.splitlines() if line.strip()]
-                        else:
+                        try:
+                            selected_info = z.getinfo("SELECTED_RECIPES.txt")
+                        except KeyError:
                             flash("The uploaded ZIP does not contain a SELECTED_RECIPES.txt file.")
+                        else:
+                            with z.open(selected_info) as raw, io.TextIOWrapper(raw, encoding="utf-8") as f:
+                                imported_recipes = [line.strip() for line in f if line.strip()]
                 except Exception as e:
-                    logging.error(f"Error importing datapack: {str(e)}")
+                    logger.error("Error importing datapack: %s", e)
                     flash(f"Error importing datapack: {str(e)}")
                 return render_template("index.html",
                                        options_by_category=options_by_category,
@@ -508,32 +850,40 @@ def index():
                 flash("No options selected!")
                 return redirect(url_for("index"))
 
-            # Get selected options from all loaded options
-            all_options = [opt for opts in options_by_category.values() for opt in opts]
-            selected_options = [opt for opt in all_options if opt["id"] in selected_ids]
+            # Get selected options from all loaded options, ignoring repeated IDs
+            selected_options = [options_by_id[i] for i in dict.fromkeys(selected_ids) if i in options_by_id]
 
             try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    output_path = os.path.join(temp_dir, "datapack")
-                    os.makedirs(output_path)
-                    create_datapack(output_path, selected_options)
-
-                    selected_names = [opt['display_name'] for opt in selected_options]
-                    names_string = "".join(name.strip().replace(" ", "_") for name in sorted(selected_names))
-                    hash_id = hashlib.md5(names_string.encode()).hexdigest()[:8]
-                    zip_filename = f"Better_Recipes_{hash_id}_1.21.4.zip"
-
-                    memory_file = create_zip_in_memory(output_path)
-
-                    return send_file(
-                        memory_file,
-                        mimetype='application/zip',
-                        as_attachment=True,
-                        download_name=zip_filename
-                    )
+                # Feed the names to the hash one by one instead of joining them first
+                name_hash = hashlib.blake2b(digest_size=4)
+                for name in sorted(opt['display_name'] for opt in selected_options):
+                    name_hash.update(name.strip().replace(" ", "_").encode())
+                hash_id = name_hash.hexdigest()
+                zip_filename = f"Better_Recipes_{hash_id}_1.21.4.zip"
+
+                datapack_files = collect_datapack_files(selected_options)
+                cache_key = datapack_cache_key(datapack_files)
+                if ACCEL_REDIRECT_DIR:
+                    return send_datapack_via_accel(datapack_files, cache_key, zip_filename)
+
+                headers = {'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+                cached_zip = cache.get(cache_key)
+                if cached_zip is not None:
+                    return Response(cached_zip, mimetype='application/zip', headers=headers)
+
+                chunks = stream_datapack(datapack_files)
+                # Run the file selection up to the first chunk here, so errors are still
+                # reported to the user instead of cutting off a started download
+                first_chunk = next(chunks)
+
+                return Response(
+                    cache_datapack(cache_key, itertools.chain([first_chunk], chunks)),
+                    mimetype='application/zip',
+                    headers=headers
+                )
 
             except Exception as e:
-                logging.error(f"Error creating datapack: {str(e)}")
+                logger.error("Error creating datapack: %s", e)
                 flash(f"Error creating datapack: {str(e)}")
                 return redirect(url_for("index"))
 
@@ -543,7 +893,7 @@ def index():
                                category_images=category_images)
 
     except Exception as e:
-        logging.error(f"Unhandled error in index route: {str(e)}")
+        logger.error("Unhandled error in index route: %s", e)
         flash("An unexpected error occurred. Please try again later.")
         return render_template("index.html",
                                options_by_category={},
@@ -552,4 +902,4 @@ def index():
 
 
 if __name__ == "__main__":
-    app.run(debug=False)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1")
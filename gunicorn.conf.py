@@ -0,0 +1,13 @@
+# Production settings for serving the site with: gunicorn -c gunicorn.conf.py app:app
+import multiprocessing
+
+bind = "0.0.0.0:8000"
+# Each worker is a separate process: set RATELIMIT_STORAGE_URI (see app.py) to shared
+# storage such as Redis, otherwise every worker keeps its own rate limit counters and
+# clients get up to `workers` times the configured limits
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = "gthread"
+threads = 4
+keepalive = 5
+# Keep the worker heartbeat files off disk
+worker_tmp_dir = "/dev/shm"